@@ -1,36 +1,184 @@
 import base64
-import glob
+import codecs
+import functools
 import hashlib
+import io
+import itertools
+import json
+import mmap
 import os
+import queue
 import re
+import threading
 import time
 import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 
 import requests
 import streamlit as st
 import streamlit.components.v1 as components
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from PIL import Image
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ResponseError
+from urllib3.util.retry import Retry
+
+# Prefer the C-backed lxml parser, fall back to the pure-Python one
+try:
+    import lxml.etree
+    import lxml.html
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    lxml = None
+    HTML_PARSER = "html.parser"
+
+# orjson serialises the viewer's image table much faster; json works too
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Transient failures (dropped connections, 429/5xx) are retried inside urllib3
+# with exponential backoff, honouring any Retry-After header from the server
+RETRY_POLICY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET", "HEAD"],
+    respect_retry_after_header=True,
+)
+
+
+# Streamlit re-runs this script on every interaction, so the session is kept as
+# a cached resource; otherwise each rerun would start with a cold connection pool
+@st.cache_resource(show_spinner=False)
+def _create_session():
+    """HTTP session whose pooled keep-alive connections are shared by all requests"""
+    session = requests.Session()
+    session.headers.update({"User-Agent": "Mozilla/5.0"})
+
+    adapter = HTTPAdapter(
+        pool_connections=16, pool_maxsize=32, max_retries=RETRY_POLICY
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+SESSION = _create_session()
+
+# Where fetched HTML pages are cached for conditional requests
+HTTP_CACHE_DIR = ".http_cache"
+
+# Seconds a fetched chapter list is reused before the main page is rechecked
+CHAPTER_LIST_TTL = 300
+
+# Where downloaded manga are stored
+COMICS_DIR = "comics"
+
+# Per-manga record of image content digests, used to spot duplicate pages
+HASHES_FILE = ".hashes.json"
+
+# Seconds a chapter list saved in HTTP_CACHE_DIR is reused, so reopening the
+# app doesn't download the main page again
+INDEX_MAX_AGE = 24 * 60 * 60
+
+# Folder Streamlit serves at app/static/ when server.enableStaticServing is on.
+# Keep COMICS_DIR inside it to let the viewer load pages by URL instead of
+# embedding them in the page as base64.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+# File extensions treated as manga pages
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".gif", ".webp"})
+
+# (connect, read) timeout in seconds for HTTP requests
+REQUEST_TIMEOUT = (5, 30)
+
+# Number of chapters downloaded concurrently, and the cap on image requests
+# in flight across all of them
+CHAPTER_WORKERS = 3
+MAX_CONCURRENT_REQUESTS = 16
+
+# Chunk size for streaming image bodies to disk
+WRITE_CHUNK_SIZE = 256 * 1024
+
+# Images smaller than this (by Content-Length) are spacers or tracking pixels
+MIN_IMAGE_BYTES = 1024
+
+# Default number of images fetched concurrently per chapter
+IMAGE_WORKERS = 8
+
+# Pages wider than this are downscaled before being sent to the viewer
+DISPLAY_MAX_WIDTH = 1200
+
+# Pages on either side of the current one that the viewer loads in advance
+PREFETCH_PAGES = 2
+
+# After a 429, a host's request spacing is doubled (at most MAX_SLOWDOWN
+# times) until THROTTLE_COOLDOWN seconds pass without another one
+MAX_SLOWDOWN = 8
+THROTTLE_COOLDOWN = 60
+
+# Minimum seconds between progress redraws; each one is a frontend round-trip
+PROGRESS_INTERVAL = 0.1
+
+# Suffixes stripped from page titles, e.g. "Title - Read Manga Online Free"
+_TITLE_CLEAN = re.compile(r"\s*-?\s*(manga|read online|free|scans).*$", re.IGNORECASE)
+
+# Image URLs that look like icons, logos, ads, etc. rather than manga pages.
+# Matches whole path segments only, so "/upload/" or "/download/" are kept.
+_SKIP_RE = re.compile(
+    r"(?:^|[/_\-\.])(icon|logo|ads?|banner|sprite)(?:[/_\-\.]|$)", re.IGNORECASE
+)
 
 # Set page config
 st.set_page_config(page_title="Manga Downloader", page_icon="📚", layout="wide")
 
 
-def get_manga_title(soup, url):
+def _class_xpath(class_name):
+    """XPath matching elements that have the given CSS class"""
+    return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+
+
+# Common title selectors in priority order, as CSS for BeautifulSoup and
+# XPath for lxml trees
+TITLE_SELECTORS = [
+    ("h1", "//h1"),
+    (".manga-title", _class_xpath("manga-title")),
+    (".series-title", _class_xpath("series-title")),
+    ("title", "//title"),
+]
+
+if lxml is not None:
+    # Plain strings, so the results don't keep the parsed tree alive
+    _HREF_XPATH = lxml.etree.XPath("//a/@href", smart_strings=False)
+
+    # Default image lookup on chapter pages, matching soup.select("p img")
+    _PARAGRAPH_IMG_XPATH = lxml.etree.XPath("//p//img")
+    _IMG_XPATH = lxml.etree.XPath("//img")
+
+    # Title lookups compiled once; each returns the first match's text
+    _TITLE_XPATHS = {
+        xpath: lxml.etree.XPath(f"string(({xpath})[1])", smart_strings=False)
+        for _, xpath in TITLE_SELECTORS
+    }
+
+
+def get_manga_title(page, url):
     """Extract manga title from the main page or fallback to domain name"""
     # Try to get title from common selectors
-    title_selectors = ["h1", ".manga-title", ".series-title", "title"]
+    for selector, xpath in TITLE_SELECTORS:
+        if isinstance(page, BeautifulSoup):
+            title_element = page.select_one(selector)
+            text = title_element.text if title_element else ""
+        else:
+            text = _TITLE_XPATHS[xpath](page)
 
-    for selector in title_selectors:
-        title_element = soup.select_one(selector)
-        if title_element and title_element.text.strip():
+        if text.strip():
             # Clean title by removing terms like "manga", "read online", etc.
-            title = title_element.text.strip()
-            title = re.sub(
-                r"\s*-?\s*(manga|read online|free|scans).*$",
-                "",
-                title,
-                flags=re.IGNORECASE,
-            )
+            title = text.strip()
+            title = _TITLE_CLEAN.sub("", title)
             return title.strip()
 
     # Fallback to domain name
@@ -39,38 +187,189 @@ def get_manga_title(soup, url):
     return domain.title()
 
 
-def fetch_chapter_links(url, chapter_regex):
-    """Fetch all chapter links from the main page"""
-    try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        response.raise_for_status()
+# A cached resource rather than lru_cache, which would be rebuilt on each rerun
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _get_chapter_pattern(chapter_regex):
+    """Compile the user's chapter regex once per distinct pattern"""
+    return re.compile(chapter_regex)
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        manga_title = get_manga_title(soup, url)
 
-        # Find all links
-        all_links = soup.find_all("a", href=True)
+def _cache_paths(url):
+    """Body and metadata paths for a URL in the HTML cache"""
+    key = hashlib.sha256(url.encode()).hexdigest()
+    base = os.path.join(HTTP_CACHE_DIR, key)
+    return base + ".html", base + ".json"
+
+
+def _declared_charset(content_type):
+    """Charset named in a Content-Type header, or None if there isn't a usable one"""
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            charset = value.strip().strip("\"'")
+            try:
+                return codecs.lookup(charset).name
+            except LookupError:
+                return None
+    return None
+
+
+def fetch_page(url, session=SESSION, use_cache=True):
+    """Fetch an HTML page, revalidating any cached copy with ETag/Last-Modified
+
+    Returns the page body as bytes, and the charset named by its Content-Type
+    header (None if there was none). A "304 Not Modified" answer is served from
+    the on-disk cache, so unchanged index and chapter pages aren't downloaded
+    again across reruns or app restarts. With use_cache=False the page is
+    downloaded in full, and the cached copy is replaced.
+    """
+    body_path, meta_path = _cache_paths(url)
+
+    cached = None
+    if use_cache:
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+
+    if response.status_code == 304 and cached:
+        try:
+            with open(body_path, "rb") as f:
+                return f.read(), cached.get("encoding")
+        except OSError:
+            # Cache body went missing, fetch it again unconditionally
+            response = session.get(url, timeout=REQUEST_TIMEOUT)
+
+    response.raise_for_status()
+
+    encoding = _declared_charset(response.headers.get("Content-Type", ""))
+    meta = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "encoding": encoding,
+    }
+    if meta["etag"] or meta["last_modified"]:
+        try:
+            os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+            _write_atomic(body_path, response.content)
+            _write_atomic(meta_path, json.dumps(meta).encode())
+        except OSError:
+            pass  # Caching is best effort
+
+    return response.content, encoding
+
+
+def _html_tree(content, encoding):
+    """Parse page bytes with lxml, decoding them as `encoding` if it is known"""
+    if encoding is None:
+        # With no charset to go on, lxml honours a <meta charset> but reads
+        # anything else as Latin-1, which garbles the common undeclared UTF-8
+        try:
+            content.decode("utf-8")
+            encoding = "utf-8"
+        except UnicodeDecodeError:
+            pass
+
+    return lxml.html.fromstring(content, parser=lxml.html.HTMLParser(encoding=encoding))
+
+
+def _write_atomic(path, data):
+    """Write bytes to path so readers never see a partially written file"""
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _absolute_url(href, page_url, base):
+    """Resolve a link found on page_url, where base is urlsplit(page_url)
+
+    Absolute, protocol-relative and root-relative links are assembled directly
+    so loops over many links don't re-parse the page URL for each one.
+    """
+    if href.startswith(("http://", "https://")):
+        return href
+    if href.startswith("//"):
+        return f"{base.scheme}:{href}"
+    if href.startswith("/") and "/." not in href:
+        return f"{base.scheme}://{base.netloc}{href}"
+    return urllib.parse.urljoin(page_url, href)
+
+
+# Server-wide memo of recent chapter lists, keyed on (url, chapter_regex)
+@st.cache_resource(show_spinner=False)
+def _recent_chapter_links():
+    """Dict of (url, regex) -> (monotonic fetch time, (title, chapters))"""
+    return {}
+
+
+def _remember_chapter_links(recent, key, result):
+    """Memoize a chapter list, dropping entries older than CHAPTER_LIST_TTL"""
+    now = time.monotonic()
+    # The memo is shared by every session, so iterate over a snapshot
+    for old_key, (fetched_at, _) in list(recent.items()):
+        if now - fetched_at >= CHAPTER_LIST_TTL:
+            recent.pop(old_key, None)
+    recent[key] = (now, result)
+
+
+def fetch_chapter_links(
+    url, chapter_regex, on_status=None, session=SESSION, force_refresh=False
+):
+    """Fetch all chapter links from the main page
+
+    `on_status`, if given, is called with a short message as each stage starts
+    so the UI can show progress while the page is downloaded and parsed.
 
-        # Compile regex pattern
-        pattern = re.compile(chapter_regex)
+    A list fetched within the last CHAPTER_LIST_TTL seconds, or saved to disk
+    within the last INDEX_MAX_AGE, is returned without any request.
+    `force_refresh` skips that and every other cache, downloading and parsing
+    the page again, and forgets the cached chapter image lists.
+    """
+    report = on_status or (lambda message: None)
 
-        # Extract chapter links and numbers
-        chapters = {}
-        for link in all_links:
-            href = link["href"]
-            match = pattern.search(href)
+    if force_refresh:
+        _extract_image_urls.clear()
 
-            if match:
-                chapter_num = match.group(1)
-                full_url = urllib.parse.urljoin(url, href)
-                chapters[chapter_num] = full_url
+    recent = _recent_chapter_links()
+    key = (url, chapter_regex)
+    if not force_refresh:
+        hit = recent.get(key)
+        if hit and time.monotonic() - hit[0] < CHAPTER_LIST_TTL:
+            manga_title, chapters = hit[1]
+            return manga_title, dict(chapters)
 
-        # Sort chapters by number (numeric sort)
-        sorted_chapters = {
-            k: chapters[k] for k in sorted(chapters.keys(), key=lambda x: int(x))
-        }
+        saved = _load_chapter_index(url, chapter_regex)
+        if saved:
+            _remember_chapter_links(recent, key, saved)
+            manga_title, chapters = saved
+            return manga_title, dict(chapters)
 
-        return manga_title, sorted_chapters
+    try:
+        report(f"Downloading {url} ...")
+        content, encoding = fetch_page(url, session, use_cache=not force_refresh)
+
+        report(f"Parsing page ({len(content) // 1024} KB) ...")
+        manga_title, chapters = _parse_chapter_links(
+            content, encoding, url, chapter_regex
+        )
+
+        # An empty list is usually a block or interstitial page; don't hold on
+        # to it, so the next fetch tries the real page again
+        if chapters:
+            _remember_chapter_links(recent, key, (manga_title, chapters))
+            _save_chapter_index(manga_title, url, chapter_regex, chapters)
+        return manga_title, dict(chapters)
 
     except requests.RequestException as e:
         st.error(f"Error fetching page: {e}")
@@ -80,188 +379,822 @@ def fetch_chapter_links(url, chapter_regex):
         return None, {}
 
 
+def _index_path(url, chapter_regex):
+    """Where the chapter list for a URL and regex is saved in the HTML cache"""
+    key = hashlib.sha256(f"{url}\n{chapter_regex}".encode()).hexdigest()
+    return os.path.join(HTTP_CACHE_DIR, key + ".index.json")
+
+
+def _load_chapter_index(url, chapter_regex):
+    """Saved (manga_title, chapters) for url, or None if missing or too old"""
+    try:
+        with open(_index_path(url, chapter_regex), encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # Anything else in the file (an older format, a hand edit) is ignored
+    try:
+        fresh = time.time() - saved["fetched_at"] < INDEX_MAX_AGE
+        manga_title, chapters = saved["manga_title"], saved["chapters"]
+    except (KeyError, TypeError):
+        return None
+
+    if not (fresh and isinstance(manga_title, str) and isinstance(chapters, dict)):
+        return None
+    return manga_title, chapters
+
+
+def _save_chapter_index(manga_title, url, chapter_regex, chapters):
+    """Save a fetched chapter list for _load_chapter_index"""
+    saved = {
+        "source_url": url,
+        "manga_title": manga_title,
+        "fetched_at": time.time(),
+        "chapters": chapters,
+    }
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        _write_atomic(_index_path(url, chapter_regex), json.dumps(saved).encode())
+    except OSError:
+        pass  # Saving is best effort, the fetched list is still returned
+
+
+# Keyed on the page body, so fetching an unchanged index again (usually a 304
+# from fetch_page) skips the parse, while any change is picked up immediately
+@st.cache_data(max_entries=32, show_spinner=False)
+def _parse_chapter_links(content, encoding, url, chapter_regex):
+    """Parse the main page into (title, {chapter number: URL})"""
+    # Compile regex pattern (reused across reruns with the same regex)
+    pattern = _get_chapter_pattern(chapter_regex)
+
+    # Find all links, pulling hrefs straight out of lxml when available
+    if lxml is not None:
+        tree = _html_tree(content, encoding)
+        manga_title = get_manga_title(tree, url)
+        all_hrefs = _HREF_XPATH(tree)
+    else:
+        soup = BeautifulSoup(content, HTML_PARSER, from_encoding=encoding)
+        manga_title = get_manga_title(soup, url)
+        # Let BeautifulSoup drop non-chapter links while it walks the tree
+        all_hrefs = [link["href"] for link in soup.find_all("a", href=pattern)]
+
+    # Extract chapter links keyed by number, so "01" and "1" are the same
+    # chapter and repeated links (e.g. "next chapter") are only joined once.
+    # The number is kept as first matched, since it names the chapter's folder
+    # and zero-padded sites already have "Chapter 01" on disk.
+    base = urllib.parse.urlsplit(url)
+    chapters = {}
+    for href in all_hrefs:
+        match = pattern.search(href)
+
+        if match:
+            chapter_num = int(match.group(1))
+            if chapter_num not in chapters:
+                chapters[chapter_num] = (match.group(1), _absolute_url(href, url, base))
+
+    # Sort chapters by number, keeping the matched strings as keys
+    sorted_chapters = dict(chapters[num] for num in sorted(chapters))
+
+    return manga_title, sorted_chapters
+
+
+def _has_images(chapter_dir, min_images):
+    """Check if a folder holds at least min_images image files"""
+    try:
+        with os.scandir(chapter_dir) as entries:
+            images = (
+                entry
+                for entry in entries
+                if entry.is_file()
+                and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS
+            )
+
+            # Stop reading the directory as soon as enough images were seen
+            image_count = sum(1 for _ in itertools.islice(images, min_images))
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+    return image_count >= min_images
+
+
+@functools.lru_cache(maxsize=64)
+def _downloaded_chapters(manga_title, min_images):
+    """Scan a manga folder once for chapters that have at least min_images"""
+    manga_dir = os.path.join(COMICS_DIR, manga_title)
+    try:
+        with os.scandir(manga_dir) as entries:
+            chapter_dirs = [
+                entry
+                for entry in entries
+                if entry.is_dir() and entry.name.startswith("Chapter ")
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return frozenset()
+
+    return frozenset(
+        entry.name[len("Chapter ") :]
+        for entry in chapter_dirs
+        if _has_images(entry.path, min_images)
+    )
+
+
 def is_chapter_downloaded(manga_title, chapter_num, min_images=3):
     """Check if chapter is already downloaded with at least min_images"""
-    chapter_dir = os.path.join("comics", manga_title, f"Chapter {chapter_num}")
+    return chapter_num in _downloaded_chapters(manga_title, min_images)
+
+
+class RateLimiter:
+    """Space out requests made by several worker threads, backing off on 429s"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+        self._slowdown = 1
+        self._slowdown_until = 0.0
+
+    def wait(self):
+        """Block until the next request slot is available"""
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._slowdown_until:
+                self._slowdown = 1
+
+            wait_time = self._next_time - now
+            spacing = self.interval * self._slowdown
+            self._next_time = max(now, self._next_time) + spacing
+
+        if wait_time > 0:
+            time.sleep(wait_time)
 
-    if not os.path.exists(chapter_dir):
+    def slow_down(self):
+        """Back off after the host signalled that requests come too fast"""
+        with self._lock:
+            self._slowdown = min(self._slowdown * 2, MAX_SLOWDOWN)
+            self._slowdown_until = time.monotonic() + THROTTLE_COOLDOWN
+
+
+# One limiter per host, shared by every worker that talks to that host. Cached
+# resources like SESSION, so every rerun and browser session uses the same ones.
+@st.cache_resource(show_spinner=False)
+def _create_rate_limiters():
+    """Dict of host -> RateLimiter, and the lock guarding it"""
+    return {}, threading.Lock()
+
+
+_rate_limiters, _rate_limiters_lock = _create_rate_limiters()
+
+
+def get_rate_limiter(url, interval):
+    """Get the shared rate limiter for a URL's host, set to the given interval"""
+    host = urllib.parse.urlparse(url).netloc
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(host)
+        if limiter is None:
+            limiter = _rate_limiters[host] = RateLimiter(interval)
+        else:
+            limiter.interval = interval
+        return limiter
+
+
+# Caps in-flight image requests across all chapters being downloaded at once,
+# in every session
+@st.cache_resource(show_spinner=False)
+def _create_request_slots():
+    """Semaphore with one slot per request allowed in flight"""
+    return threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+
+_request_slots = _create_request_slots()
+
+
+def _get_watching_for_429(session, url, rate_limiter):
+    """Stream a GET, slowing the host's rate limiter down if it answered 429"""
+    try:
+        response = session.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+    except requests.exceptions.RetryError as e:
+        # Still rate limited after every retry, rather than out of retries on
+        # 5xx answers; urllib3 only says which in its error message
+        reason = getattr(e.args[0] if e.args else None, "reason", None)
+        if str(reason) == ResponseError.SPECIFIC_ERROR.format(status_code=429):
+            rate_limiter.slow_down()
+        raise
+
+    # urllib3 retries 429s by itself; its history shows whether any happened
+    retries = getattr(response.raw, "retries", None)
+    if any(entry.status == 429 for entry in getattr(retries, "history", ())):
+        rate_limiter.slow_down()
+
+    return response
+
+
+class ContentIndex:
+    """Digests of a manga's downloaded images, persisted in its HASHES_FILE"""
+
+    def __init__(self, manga_dir):
+        self.manga_dir = manga_dir
+        self.path = os.path.join(manga_dir, HASHES_FILE)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._files = json.load(f)
+        except (OSError, ValueError):
+            self._files = {}
+
+        # Reverse lookup, to forget a path's old digest when it is re-downloaded
+        self._digests = {path: digest for digest, path in self._files.items()}
+
+    def claim(self, digest, file_path):
+        """Record file_path as holding digest
+
+        Returns the path of an earlier file with the same content, if one is
+        still on disk and still has that digest, or None if file_path is the
+        first copy.
+        """
+        rel_path = os.path.relpath(file_path, self.manga_dir)
+        with self._lock:
+            old_digest = self._digests.get(rel_path)
+            if old_digest != digest and self._files.get(old_digest) == rel_path:
+                del self._files[old_digest]
+            self._digests[rel_path] = digest
+
+            existing = self._files.get(digest)
+
+        # The file may have been replaced since it was recorded. It is hashed
+        # without the lock, which every chapter of the manga shares.
+        if existing and existing != rel_path:
+            existing_path = os.path.join(self.manga_dir, existing)
+            if _file_digest(existing_path) == digest:
+                return existing_path
+
+        with self._lock:
+            # Another thread may have recorded a copy while this one hashed
+            if self._files.get(digest) in (None, existing):
+                self._files[digest] = rel_path
+        return None
+
+    def save(self):
+        """Write the digests back to disk"""
+        # Held while writing so concurrent saves can't replace newer data
+        with self._lock:
+            _write_atomic(self.path, json.dumps(self._files).encode())
+
+
+# One index per manga, shared by every chapter being downloaded at once, so
+# sessions downloading the same manga don't overwrite each other's HASHES_FILE
+@st.cache_resource(show_spinner=False)
+def _create_content_indexes():
+    """Dict of manga title -> ContentIndex, and the lock guarding it"""
+    return {}, threading.Lock()
+
+
+_content_indexes, _content_indexes_lock = _create_content_indexes()
+
+
+def get_content_index(manga_title):
+    """Get the shared content index for a manga's download folder"""
+    with _content_indexes_lock:
+        index = _content_indexes.get(manga_title)
+        if index is None:
+            manga_dir = os.path.join(COMICS_DIR, manga_title)
+            index = _content_indexes[manga_title] = ContentIndex(manga_dir)
+        return index
+
+
+def _file_digest(path):
+    """Digest of a file's bytes as recorded in a ContentIndex, or None if unreadable"""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(WRITE_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _share_duplicate(existing_path, file_path):
+    """Put a hard link to an identical existing file at file_path
+
+    Returns False if hard links aren't available here, and the page has to
+    be written out as a separate copy.
+    """
+    tmp_path = f"{file_path}.{threading.get_ident()}.link"
+    try:
+        os.link(existing_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return False
+    return True
 
-    # Check if directory contains minimum number of images
-    image_extensions = [".jpg", ".jpeg", ".png", ".gif", ".webp"]
-    image_count = 0
 
-    for ext in image_extensions:
-        image_count += len(glob.glob(os.path.join(chapter_dir, f"*{ext}")))
+class ThrottledProgress:
+    """Progress bar and status line that redraw at most every `interval` seconds"""
 
-    return image_count >= min_images
+    def __init__(self, ui=st, interval=PROGRESS_INTERVAL):
+        self.interval = interval
+        self._progress_bar = ui.progress(0)
+        self._status_text = ui.empty()
+        self._last_update = 0.0
+        self._pending = None
 
+    def update(self, fraction, text):
+        """Record progress, redrawing only if the last redraw is old enough"""
+        self._pending = (fraction, text)
+        if time.monotonic() - self._last_update >= self.interval:
+            self.flush()
 
-def download_chapter_images(
-    chapter_url,
-    manga_title,
-    chapter_num,
-    container_selector=None,
-    delay=1.0,
-    skip_existing=True,
-):
-    """Download all images from a chapter page"""
-    # Check if already downloaded
-    if skip_existing and is_chapter_downloaded(manga_title, chapter_num):
-        st.info(f"Skipping Chapter {chapter_num} (already downloaded)")
-        return 0, True  # Return 0 downloaded, but was skipped
+    def flush(self):
+        """Redraw with the latest recorded progress"""
+        if self._pending is None:
+            return
+
+        fraction, text = self._pending
+        self._progress_bar.progress(fraction)
+        self._status_text.text(text)
+        self._last_update = time.monotonic()
+        self._pending = None
+
+
+class QueuedUI:
+    """Stand-in for a Streamlit container, for use from a worker thread
+
+    Streamlit elements may only be written from the script thread, so each
+    call is put on `events` as (target, key, method, args, kwargs) and drawn
+    later with draw_queued(). Calls return a QueuedUI for the element they
+    would create, so `ui.empty().text(...)` works the same as on a container.
+    """
+
+    _keys = itertools.count()
+
+    def __init__(self, events, key):
+        self._events = events
+        self._key = key
+
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def call(*args, **kwargs):
+            key = next(self._keys)
+            self._events.put((self._key, key, method, args, kwargs))
+            return QueuedUI(self._events, key)
+
+        return call
+
+
+def draw_queued(events, elements):
+    """Draw queued QueuedUI calls, where elements maps keys to real elements"""
+    while True:
+        try:
+            target, key, method, args, kwargs = events.get_nowait()
+        except queue.Empty:
+            return
+        elements[key] = getattr(elements[target], method)(*args, **kwargs)
+
+
+def _preallocate(f, response):
+    """Reserve disk space for a response body when its size is known up front"""
+    length = response.headers.get("Content-Length")
+    encoded = response.headers.get("Content-Encoding", "identity") != "identity"
+    if not length or encoded or not hasattr(os, "posix_fallocate"):
+        return
 
     try:
-        response = requests.get(chapter_url, headers={"User-Agent": "Mozilla/5.0"})
+        os.posix_fallocate(f.fileno(), 0, int(length))
+    except (OSError, ValueError):
+        pass  # Not supported by this filesystem, or a bogus header
+
+
+def _image_filename(i, img_url, chapter_dir):
+    """Local path for the i-th image of a chapter, named with a zero-padded index"""
+    file_ext = os.path.splitext(urllib.parse.urlsplit(img_url).path)[1] or ".jpg"
+    if not file_ext.startswith("."):
+        file_ext = "." + file_ext
+
+    return os.path.join(chapter_dir, f"image_{i+1:02d}{file_ext}")
+
+
+def _matches_remote_size(img_filename, img_url, session):
+    """Check with a HEAD request whether a local file has the server's size"""
+    try:
+        response = session.head(img_url, allow_redirects=True, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
+        length = int(response.headers["Content-Length"])
+    except (requests.RequestException, KeyError, ValueError):
+        return False
 
-        soup = BeautifulSoup(response.text, "html.parser")
+    return length == os.path.getsize(img_filename)
 
-        # If a container selector is provided, narrow down the search
-        if container_selector and container_selector.strip():
-            try:
-                container = soup.select_one(container_selector)
-                if container:
-                    img_elements = container.find_all("img")
-                else:
-                    img_elements = soup.find_all("img")
-            except Exception:
-                img_elements = soup.find_all("img")
+
+def _proxied_url(img_url, proxy_prefix):
+    """URL to request an image through an optional caching proxy
+
+    A prefix containing "{url}" gets the percent-encoded image URL put in its
+    place (e.g. "https://wsrv.nl/?url={url}"); any other prefix is joined to
+    the image URL with a slash.
+    """
+    if not proxy_prefix:
+        return img_url
+    if "{url}" in proxy_prefix:
+        return proxy_prefix.replace("{url}", urllib.parse.quote(img_url, safe=""))
+    return proxy_prefix.rstrip("/") + "/" + img_url
+
+
+def _download_one(
+    i, img_url, chapter_dir, delay, session=SESSION, index=None, proxy_prefix=None
+):
+    """Download a single image into the chapter folder (runs in a worker thread)
+
+    Returns the image path and whether it was fetched, which is False when an
+    identical-size copy was already on disk. The path is None if the image was
+    too small to be a page and wasn't saved. With a ContentIndex, a page whose
+    bytes match an earlier download becomes a hard link to that file.
+    """
+    # The file is named after the origin URL, so switching proxies doesn't
+    # change what counts as already downloaded
+    img_filename = _image_filename(i, img_url, chapter_dir)
+    request_url = _proxied_url(img_url, proxy_prefix)
+    rate_limiter = get_rate_limiter(request_url, delay)
+
+    # A HEAD is much cheaper than refetching an image we already have
+    if os.path.exists(img_filename):
+        rate_limiter.wait()
+        with _request_slots:
+            matches = _matches_remote_size(img_filename, request_url, session)
+        if matches:
+            return img_filename, False
+
+    rate_limiter.wait()
+
+    with _request_slots, _get_watching_for_429(
+        session, request_url, rate_limiter
+    ) as img_response:
+        img_response.raise_for_status()
+
+        # Decide from the headers alone, before any of the body is read
+        length = img_response.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) < MIN_IMAGE_BYTES:
+            return None, False
+
+        # Stream the body to a file next to the final name, hashing it on the
+        # way, and rename once complete, so an interrupted download never
+        # leaves a truncated page that looks done
+        part_filename = img_filename + ".part"
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            with open(part_filename, "wb") as f:
+                _preallocate(f, img_response)
+
+                # iter_content also undoes any gzip/deflate content encoding
+                for chunk in img_response.iter_content(chunk_size=WRITE_CHUNK_SIZE):
+                    f.write(chunk)
+                    digest.update(chunk)
+
+                # Drop any preallocated space the body didn't fill
+                f.truncate()
+        except BaseException:
+            if os.path.exists(part_filename):
+                os.remove(part_filename)
+            raise
+
+    try:
+        # A page that repeats an earlier one becomes a hard link to it, and the
+        # new copy is dropped. Either way the final name is replaced rather
+        # than rewritten, so a page linked into another chapter is left alone.
+        existing = None
+        if index is not None:
+            existing = index.claim(digest.hexdigest(), img_filename)
+        if existing and _share_duplicate(existing, img_filename):
+            os.remove(part_filename)
         else:
-            # Look for images within paragraph tags first
-            p_tags = soup.find_all("p")
-            img_elements = []
+            os.replace(part_filename, img_filename)
+    except BaseException:
+        if os.path.exists(part_filename):
+            os.remove(part_filename)
+        raise
+
+    return img_filename, True
+
+    # Write next to the final name and rename once complete, so an interrupted
+    # write never leaves a truncated page that looks done. The rename also
+    # replaces, rather than rewrites, a page hard-linked to a duplicate
+    # elsewhere.
+    part_filename = img_filename + ".part"
+    try:
+        with open(part_filename, "wb") as f:
+            _preallocate(f, img_response)
+            f.writelines(chunks)
 
-            for p in p_tags:
-                img_elements.extend(p.find_all("img"))
+            # Drop any preallocated space the body didn't fill
+            f.truncate()
 
-            # If no images found in p tags, get all img tags
-            if not img_elements:
-                img_elements = soup.find_all("img")
+        os.replace(part_filename, img_filename)
+    except BaseException:
+        if os.path.exists(part_filename):
+            os.remove(part_filename)
+        raise
 
-        # Create directory
-        chapter_dir = os.path.join("comics", manga_title, f"Chapter {chapter_num}")
-        os.makedirs(chapter_dir, exist_ok=True)
+    return img_filename, True
 
-        # Download images
-        image_count = len(img_elements)
-        downloaded = 0
 
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+# Without lxml, parse only what the default image lookup needs from a chapter page
+_PAGE_IMAGES = SoupStrainer(["p", "img"])
 
-        for i, img in enumerate(img_elements):
-            # Get image URL (try src, data-src, and data-lazy-src attributes)
-            img_url = img.get("src") or img.get("data-src") or img.get("data-lazy-src")
 
-            if img_url:
-                # Skip small icons, advertisements, etc.
-                if (
-                    "icon" in img_url.lower()
-                    or "logo" in img_url.lower()
-                    or "ad" in img_url.lower()
-                ):
-                    continue
+# Chapter pages rarely change once published, so the image list is cached and
+# re-running a download doesn't refetch and reparse pages we already have.
+# Finding no images raises instead, as exceptions aren't cached.
+@st.cache_data(ttl=3600, show_spinner=False)
+def _extract_image_urls(chapter_url, container_selector=None, _session=SESSION):
+    """List (index, absolute URL) pairs for the manga images on a chapter page"""
+    content, encoding = fetch_page(chapter_url, _session)
 
-                # Ensure absolute URL
-                img_url = urllib.parse.urljoin(chapter_url, img_url)
+    # If a container selector is provided, narrow down the search
+    if container_selector and container_selector.strip():
+        soup = BeautifulSoup(content, HTML_PARSER, from_encoding=encoding)
+        try:
+            container = soup.select_one(container_selector)
+            if container:
+                img_elements = container.find_all("img")
+            else:
+                img_elements = soup.find_all("img")
+        except Exception:
+            img_elements = soup.find_all("img")
+    elif lxml is not None:
+        # lxml elements support .get() like bs4 tags, so no soup is needed
+        tree = _html_tree(content, encoding)
+
+        # Look for images within paragraph tags first, in a single pass.
+        # If no images found in p tags, get all img tags
+        img_elements = _PARAGRAPH_IMG_XPATH(tree) or _IMG_XPATH(tree)
+    else:
+        # Only paragraphs and images matter here, so skip building the rest
+        soup = BeautifulSoup(
+            content, HTML_PARSER, parse_only=_PAGE_IMAGES, from_encoding=encoding
+        )
 
-                try:
-                    # Add delay to avoid overwhelming the server
-                    time.sleep(delay)
+        # Look for images within paragraph tags first, in a single pass.
+        # If no images found in p tags, get all img tags
+        img_elements = soup.select("p img") or soup.find_all("img")
 
-                    img_response = requests.get(
-                        img_url, headers={"User-Agent": "Mozilla/5.0"}
-                    )
-                    img_response.raise_for_status()
+    # Collect image URLs to download
+    base = urllib.parse.urlsplit(chapter_url)
+    tasks = []
+    for i, img in enumerate(img_elements):
+        # Get image URL (try src, data-src, and data-lazy-src attributes)
+        img_url = img.get("src") or img.get("data-src") or img.get("data-lazy-src")
 
-                    # Save image with zero-padded index
-                    file_ext = (
-                        os.path.splitext(urllib.parse.urlparse(img_url).path)[1]
-                        or ".jpg"
-                    )
-                    if not file_ext.startswith("."):
-                        file_ext = "." + file_ext
+        if img_url:
+            # Skip small icons, advertisements, etc.
+            if _SKIP_RE.search(img_url):
+                continue
 
-                    img_filename = os.path.join(
-                        chapter_dir, f"image_{i+1:02d}{file_ext}"
-                    )
+            # Ensure absolute URL
+            tasks.append((i, _absolute_url(img_url, chapter_url, base)))
 
-                    with open(img_filename, "wb") as f:
-                        f.write(img_response.content)
+    # Likely an interstitial page or a selector typo; don't cache that for an hour
+    if not tasks:
+        raise ValueError("no manga images found on the chapter page")
 
-                    downloaded += 1
-                    progress_bar.progress(
-                        downloaded / image_count if image_count > 0 else 1.0
-                    )
-                    status_text.text(
-                        f"Downloading Chapter {chapter_num}: {downloaded}/{image_count} images"
-                    )
+    return tasks
+
+
+def download_chapter_images(
+    chapter_url,
+    manga_title,
+    chapter_num,
+    container_selector=None,
+    delay=1.0,
+    skip_existing=True,
+    workers=IMAGE_WORKERS,
+    proxy_prefix=None,
+    session=SESSION,
+    ui=st,
+):
+    """Download all images from a chapter page
 
+    Messages and progress are written to `ui`, which can be a container, or a
+    QueuedUI when the chapter is downloaded in a worker thread.
+    """
+    # Check if already downloaded
+    if skip_existing and is_chapter_downloaded(manga_title, chapter_num):
+        ui.info(f"Skipping Chapter {chapter_num} (already downloaded)")
+        return 0, True  # Return 0 downloaded, but was skipped
+
+    try:
+        tasks = _extract_image_urls(chapter_url, container_selector, session)
+
+        # Create directory
+        chapter_dir = os.path.join(COMICS_DIR, manga_title, f"Chapter {chapter_num}")
+        os.makedirs(chapter_dir, exist_ok=True)
+
+        # Download images
+        image_count = len(tasks)
+        downloaded = 0
+        done = 0
+
+        progress = ThrottledProgress(ui)
+        content_index = get_content_index(manga_title)
+
+        # Don't spin up more threads than there are images to fetch
+        workers = max(1, min(workers, image_count))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    _download_one,
+                    i,
+                    img_url,
+                    chapter_dir,
+                    delay,
+                    session,
+                    content_index,
+                    proxy_prefix,
+                ): i
+                for i, img_url in tasks
+            }
+
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    _, fetched = future.result()
                 except Exception as e:
-                    st.warning(
+                    ui.warning(
                         f"Error downloading image {i+1} from chapter {chapter_num}: {e}"
                     )
+                    continue
 
+                done += 1
+                downloaded += fetched
+                progress.update(
+                    done / image_count if image_count > 0 else 1.0,
+                    f"Downloading Chapter {chapter_num}: {done}/{image_count} images",
+                )
+
+        progress.flush()
+        if downloaded:
+            content_index.save()
         return downloaded, False  # Return downloaded count and not skipped
 
     except Exception as e:
-        st.error(f"Error processing chapter {chapter_num}: {e}")
+        ui.error(f"Error processing chapter {chapter_num}: {e}")
         return 0, False  # Return 0 downloaded and not skipped
 
 
-def get_available_manga():
-    """Get list of downloaded manga folders"""
-    if not os.path.exists("comics"):
+def _dir_mtime(path):
+    """Get a directory's modification time, or None if it doesn't exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+# Library scans are cached across Streamlit reruns. The directory mtime is part
+# of the cache key, so entries are refreshed as soon as something is downloaded.
+@st.cache_data(ttl=60, show_spinner=False)
+def _scan_manga(mtime):
+    """List manga folders in the comics directory"""
+    if mtime is None:
         return []
 
-    return [
-        name
-        for name in os.listdir("comics")
-        if os.path.isdir(os.path.join("comics", name))
-    ]
+    with os.scandir(COMICS_DIR) as entries:
+        return [entry.name for entry in entries if entry.is_dir()]
 
 
-def get_available_chapters(manga_title):
-    """Get list of downloaded chapter folders for a manga"""
-    manga_dir = os.path.join("comics", manga_title)
-    if not os.path.exists(manga_dir):
+@st.cache_data(ttl=60, show_spinner=False)
+def _scan_chapters(manga_title, mtime):
+    """List chapter folders of a manga, sorted numerically"""
+    if mtime is None:
         return []
 
-    chapter_dirs = [
-        name
-        for name in os.listdir(manga_dir)
-        if os.path.isdir(os.path.join(manga_dir, name)) and name.startswith("Chapter ")
-    ]
+    with os.scandir(os.path.join(COMICS_DIR, manga_title)) as entries:
+        chapter_dirs = [
+            entry.name
+            for entry in entries
+            if entry.is_dir() and entry.name.startswith("Chapter ")
+        ]
 
     # Sort numerically
     chapter_dirs.sort(key=lambda x: int(x.split("Chapter ")[1]))
     return chapter_dirs
 
 
-def get_chapter_images(manga_title, chapter):
-    """Get list of image files in a chapter folder"""
-    chapter_dir = os.path.join("comics", manga_title, chapter)
-
-    if not os.path.exists(chapter_dir):
+@st.cache_data(ttl=60, show_spinner=False)
+def _scan_images(manga_title, chapter, mtime):
+    """List image files in a chapter folder, sorted by filename"""
+    if mtime is None:
         return []
 
-    # Get all image files
-    image_extensions = [".jpg", ".jpeg", ".png", ".gif", ".webp"]
-    images = []
-
-    for ext in image_extensions:
-        images.extend(glob.glob(os.path.join(chapter_dir, f"*{ext}")))
+    # Get all image files in a single directory pass
+    with os.scandir(os.path.join(COMICS_DIR, manga_title, chapter)) as entries:
+        images = [
+            entry.path
+            for entry in entries
+            if entry.is_file(follow_symlinks=False)
+            and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS
+        ]
 
     # Sort by filename (should be image_01, image_02, etc.)
     images.sort()
     return images
 
 
+def get_available_manga():
+    """Get list of downloaded manga folders"""
+    return _scan_manga(_dir_mtime(COMICS_DIR))
+
+
+def get_available_chapters(manga_title):
+    """Get list of downloaded chapter folders for a manga"""
+    manga_dir = os.path.join(COMICS_DIR, manga_title)
+    return _scan_chapters(manga_title, _dir_mtime(manga_dir))
+
+
+def get_chapter_images(manga_title, chapter):
+    """Get list of image files in a chapter folder"""
+    chapter_dir = os.path.join(COMICS_DIR, manga_title, chapter)
+    return _scan_images(manga_title, chapter, _dir_mtime(chapter_dir))
+
+
+def clear_library_cache():
+    """Forget cached library scans so the next call rereads the disk"""
+    _scan_manga.clear()
+    _scan_chapters.clear()
+    _scan_images.clear()
+
+
+def _downscaled_image(file_path):
+    """Image bytes downscaled to DISPLAY_MAX_WIDTH, or None if no resize is needed"""
+    try:
+        with Image.open(file_path) as image:
+            is_animated = getattr(image, "is_animated", False)
+            if image.width > DISPLAY_MAX_WIDTH and not is_animated:
+                image_format = image.format
+                size = (
+                    DISPLAY_MAX_WIDTH,
+                    max(1, image.height * DISPLAY_MAX_WIDTH // image.width),
+                )
+
+                # Let libjpeg decode at a reduced scale before resampling
+                image.draft(None, size)
+                image.thumbnail(size, Image.LANCZOS)
+
+                buffer = io.BytesIO()
+                image.save(buffer, format=image_format, quality=90)
+                return buffer.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        pass  # Not something PIL can (or should) decode, send the file unchanged
+
+    return None
+
+
+def _b64_file(file_path):
+    """Base64-encode a file straight from a memory map, without a bytes copy"""
+    with open(file_path, "rb") as image_file:
+        try:
+            with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return base64.b64encode(data).decode()
+        except ValueError:
+            return ""  # Empty files can't be mapped
+
+
 def get_image_data_url(file_path):
     """Convert a local image file to a data URL."""
-    with open(file_path, "rb") as image_file:
-        encoded_string = base64.b64encode(image_file.read()).decode()
+    # The mtime and size are part of the cache key so replaced files are
+    # re-encoded, even when the copy happens within the mtime's resolution
+    stat = os.stat(file_path)
+    return _encode_image(file_path, stat.st_mtime_ns, stat.st_size)
+
+
+def get_image_static_url(file_path):
+    """URL of a local image under Streamlit's static folder, or None if not served"""
+    if not st.get_option("server.enableStaticServing"):
+        return None
+
+    # Streamlit resolves symlinks and refuses anything outside the static folder
+    static_root = os.path.realpath(STATIC_DIR)
+    real_path = os.path.realpath(file_path)
+    if os.path.commonpath([static_root, real_path]) != static_root:
+        return None
+
+    rel_path = os.path.relpath(real_path, static_root).replace(os.sep, "/")
+    return "app/static/" + urllib.parse.quote(rel_path)
+
+
+# Cached as a shared resource so reruns reuse the same (large) string instead
+# of re-reading and re-encoding the page or copying it out of the cache
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _encode_image(file_path, mtime, size):
+    """Read a local image file and encode it as a data URL"""
+    resized = _downscaled_image(file_path)
+    if resized is not None:
+        encoded_string = base64.b64encode(resized).decode()
+    else:
+        encoded_string = _b64_file(file_path)
 
     # Determine MIME type based on file extension
     file_ext = os.path.splitext(file_path)[1].lower()
@@ -285,19 +1218,25 @@ def create_image_viewer_html(images, current_index):
     if not images:
         return "<p>No images available</p>"
 
-    # Create a unique ID for the viewer div to avoid caching issues
-    viewer_id = hashlib.md5(str(time.time()).encode()).hexdigest()[:8]
+    # ID for the viewer's elements, stable across reruns of the same chapter
+    # so an unchanged viewer renders identical HTML
+    chapter_key = f"{os.path.dirname(images[0])}|{len(images)}"
+    viewer_id = hashlib.blake2b(chapter_key.encode(), digest_size=4).hexdigest()
 
-    # Prepare image data URLs for all images
+    # Prepare image URLs for all images, served statically where possible
     image_data_urls = {}
     for i, img_path in enumerate(images):
-        image_data_urls[i] = get_image_data_url(img_path)
+        image_data_urls[i] = get_image_static_url(img_path) or get_image_data_url(
+            img_path
+        )
 
     # Convert the image_data_urls dictionary to a JavaScript object
-    js_image_data = "{"
-    for idx, data_url in image_data_urls.items():
-        js_image_data += f'"{idx}": "{data_url}",'
-    js_image_data = js_image_data.rstrip(",") + "}"
+    if orjson is not None:
+        js_image_data = orjson.dumps(
+            image_data_urls, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+    else:
+        js_image_data = json.dumps(image_data_urls)
 
     html = f"""
     <style>
@@ -487,6 +1426,28 @@ def create_image_viewer_html(images, current_index):
         const fsPageIndicator = document.getElementById('fs-page-indicator-{viewer_id}');
         const loader = document.getElementById('loader-{viewer_id}');
         
+        // Neighbouring pages loaded in the background, kept to a small window
+        const prefetchPages = {PREFETCH_PAGES};
+        const prefetched = {{}};
+        
+        // Load the pages around the current one so turning a page is instant
+        function prefetchAround(index) {{
+            // Let the browser drop pages that fell out of the window
+            for (const i in prefetched) {{
+                if (Math.abs(i - index) > prefetchPages) {{
+                    delete prefetched[i];
+                }}
+            }}
+            
+            for (let i = index - prefetchPages; i <= index + prefetchPages; i++) {{
+                if (i >= 0 && i < totalImages && i !== index && !(i in prefetched)) {{
+                    const img = new Image();
+                    img.src = imageData[i];
+                    prefetched[i] = img;
+                }}
+            }}
+        }}
+        
         // Function to update the displayed image
         function updateImage(index) {{
             // Show loader
@@ -523,6 +1484,9 @@ def create_image_viewer_html(images, current_index):
                 
                 // Hide loader after image is loaded
                 loader.style.display = 'none';
+                
+                // Start on the neighbours once the current page is showing
+                prefetchAround(index);
             }};
             
             // Set the src to trigger loading
@@ -683,11 +1647,184 @@ def create_image_viewer_html(images, current_index):
         // Initialize the page indicators
         pageIndicator.textContent = `${{currentIndex + 1}} / ${{totalImages}}`;
         fsPageIndicator.textContent = `${{currentIndex + 1}} / ${{totalImages}}`;
+        
+        // Warm up the pages next to the one shown first
+        prefetchAround(currentIndex);
     </script>
     """
     return html
 
 
+def run_downloads(chapter_nums, manga_title):
+    """Download several chapters concurrently and report overall progress"""
+    total_chapters = len(chapter_nums)
+    total_images = 0
+    skipped_chapters = 0
+    finished = 0
+
+    # Throttled, since skipped chapters finish in quick bursts
+    overall_progress = ThrottledProgress()
+    overall_progress.update(0.0, f"Processing {total_chapters} chapters...")
+
+    # One container per chapter, created up front so output keeps chapter order
+    containers = {chapter_num: st.container() for chapter_num in chapter_nums}
+
+    # Workers queue their output, and it is drawn from this thread as it comes
+    events = queue.SimpleQueue()
+    elements = dict(containers)
+
+    # Read here, since worker threads have no access to the session state
+    chapter_urls = st.session_state.chapters
+    options = (
+        st.session_state.container_selector,
+        st.session_state.delay,
+        st.session_state.skip_existing,
+        st.session_state.image_workers,
+        st.session_state.proxy_prefix,
+    )
+
+    def download(chapter_num):
+        return download_chapter_images(
+            chapter_urls[chapter_num],
+            manga_title,
+            chapter_num,
+            *options,
+            ui=QueuedUI(events, chapter_num),
+        )
+
+    executor = ThreadPoolExecutor(max_workers=CHAPTER_WORKERS)
+    pending = {executor.submit(download, num) for num in chapter_nums}
+    try:
+        while pending:
+            done, pending = wait(
+                pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED
+            )
+            # A finished chapter's output was queued before it completed
+            draw_queued(events, elements)
+
+            for future in done:
+                images_count, was_skipped = future.result()
+
+                if was_skipped:
+                    skipped_chapters += 1
+
+                total_images += images_count
+                finished += 1
+                overall_progress.update(
+                    finished / total_chapters,
+                    f"Processed {finished}/{total_chapters} chapters",
+                )
+    finally:
+        # A rerun or stop raises out of the loop above. Drop the chapters that
+        # haven't started rather than keeping the script waiting on them.
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+        # Each chapter is checked once per job, so the scan only needs
+        # refreshing when the job is over
+        _downloaded_chapters.cache_clear()
+
+        # The Browse tab's scans notice new folders by mtime, but drop them
+        # anyway in case the filesystem's timestamps are too coarse to tell
+        clear_library_cache()
+
+    if skipped_chapters > 0:
+        overall_progress.update(
+            1.0,
+            f"Download complete! {total_images} images downloaded across {total_chapters - skipped_chapters} chapters. {skipped_chapters} chapters were skipped.",
+        )
+    else:
+        overall_progress.update(
+            1.0,
+            f"Download complete! {total_images} images downloaded across {total_chapters} chapters.",
+        )
+    overall_progress.flush()
+
+    st.success(
+        f"Successfully downloaded {total_chapters - skipped_chapters} chapters of '{manga_title}'"
+    )
+
+
+# Reruns triggered inside a fragment only redraw that fragment (Streamlit 1.37+)
+_fragment = getattr(st, "fragment", lambda func: func)
+
+
+@_fragment
+def browse_library():
+    """Library picker and image viewer for downloaded chapters
+
+    Picking another manga or chapter only reruns this tab, not the Download tab.
+    """
+    st.subheader("Browse Downloaded Manga")
+
+    if st.button("Refresh Library", help="Rescan the comics folder"):
+        clear_library_cache()
+
+    available_manga = get_available_manga()
+
+    if not available_manga:
+        st.info("No manga downloaded yet. Use the Download tab to get started!")
+    else:
+        selected_manga = st.selectbox("Select Manga", available_manga)
+
+        if selected_manga:
+            available_chapters = get_available_chapters(selected_manga)
+
+            if not available_chapters:
+                st.info(f"No chapters found for {selected_manga}")
+            else:
+                selected_chapter = st.selectbox("Select Chapter", available_chapters)
+
+                if selected_chapter:
+                    chapter_images = get_chapter_images(
+                        selected_manga, selected_chapter
+                    )
+
+                    if not chapter_images:
+                        st.info(f"No images found in {selected_chapter}")
+                    else:
+                        # Image viewer with preloaded images
+                        total_images = len(chapter_images)
+
+                        # Initialize the session state for image index if it doesn't exist
+                        if "image_index" not in st.session_state:
+                            st.session_state.image_index = 0
+
+                        # Ensure the index is within bounds
+                        if st.session_state.image_index >= total_images:
+                            st.session_state.image_index = 0
+
+                        # Create the viewer HTML with all images preloaded
+                        viewer_html = create_image_viewer_html(
+                            chapter_images, st.session_state.image_index
+                        )
+
+                        # Display the viewer
+                        components.html(viewer_html, height=800, scrolling=True)
+
+                        # Add warning about memory usage for large chapters
+                        if total_images > 30:
+                            st.warning(
+                                f"This chapter has {total_images} images. If you experience performance issues, try reloading the page."
+                            )
+
+                        # Display info about keyboard shortcuts
+                        with st.expander("Keyboard Shortcuts"):
+                            st.write(
+                                """
+                                - **Left Arrow** or **A**: Previous image
+                                - **Right Arrow** or **D**: Next image
+                                - **Z**: Zoom out
+                                - **X**: Reset zoom
+                                - **C**: Zoom in
+                                - **Up/Down Arrows**: Scroll up/down when zoomed in
+                                - **F**: Toggle fullscreen
+                                - **Escape**: Exit fullscreen
+                                """
+                            )
+
+
 # Main UI
 st.title("Manga Chapter & Image Downloader")
 tab1, tab2 = st.tabs(["Download", "Browse"])
@@ -710,6 +1847,12 @@ with tab1:
             placeholder=".chapter-content",
             help="CSS selector for the container with chapter images",
         )
+        proxy_prefix = st.text_input(
+            "Image Proxy Prefix (Optional)",
+            placeholder="https://wsrv.nl/?url={url}",
+            help="Fetch images through a caching proxy; {url} is replaced by the "
+            "encoded image URL, otherwise the URL is appended to the prefix",
+        )
 
     with col2:
         delay = st.slider(
@@ -720,27 +1863,52 @@ with tab1:
             0.5,
             help="Delay between requests to avoid server overload",
         )
+        image_workers = st.slider(
+            "Parallel Image Downloads",
+            1,
+            MAX_CONCURRENT_REQUESTS,
+            IMAGE_WORKERS,
+            help="Images fetched at once per chapter; lower this if the site blocks you",
+        )
 
     skip_existing = st.checkbox(
         "Skip Already Downloaded Chapters",
         value=True,
         help="Skip chapters that have already been downloaded",
     )
+    force_refresh = st.checkbox(
+        "Force Refresh",
+        value=False,
+        help="Download the main page again instead of reusing a recent chapter list, "
+        "and re-read chapter pages when downloading",
+    )
 
     if st.button("Fetch Chapters"):
         if not url or not regex:
             st.error("Please enter both URL and chapter regex pattern")
         else:
             with st.spinner("Fetching chapters..."):
+                # Show which stage the fetch is in; cleared once it finishes
+                fetch_status = st.empty()
                 try:
-                    manga_title, chapters = fetch_chapter_links(url, regex)
+                    manga_title, chapters = fetch_chapter_links(
+                        url,
+                        regex,
+                        on_status=fetch_status.caption,
+                        force_refresh=force_refresh,
+                    )
+                    fetch_status.empty()
 
                     if manga_title and chapters:
                         st.session_state.manga_title = manga_title
                         st.session_state.chapters = chapters
+                        # fetch_chapter_links returns chapters in numeric order
+                        st.session_state.sorted_chapter_nums = list(chapters)
                         st.session_state.container_selector = container_selector
                         st.session_state.delay = delay
                         st.session_state.skip_existing = skip_existing
+                        st.session_state.image_workers = image_workers
+                        st.session_state.proxy_prefix = proxy_prefix.strip()
 
                         st.success(
                             f"Found {len(chapters)} chapters for '{manga_title}'"
@@ -751,6 +1919,7 @@ with tab1:
                         )
 
                 except Exception as e:
+                    fetch_status.empty()
                     st.error(f"Error: {e}")
 
     if "chapters" in st.session_state and st.session_state.chapters:
@@ -766,9 +1935,7 @@ with tab1:
                 # Display chapter selection options
                 chapters_to_download = st.multiselect(
                     "Select chapters to download",
-                    options=sorted(
-                        st.session_state.chapters.keys(), key=lambda x: int(x)
-                    ),
+                    options=st.session_state.sorted_chapter_nums,
                     help="Hold Ctrl/Cmd to select multiple chapters",
                 )
 
@@ -776,160 +1943,15 @@ with tab1:
                     if not chapters_to_download:
                         st.warning("Please select at least one chapter")
                     else:
-                        total_chapters = len(chapters_to_download)
-                        total_images = 0
-                        skipped_chapters = 0
-
-                        chapter_progress = st.progress(0)
-                        overall_status = st.empty()
-
-                        for i, chapter_num in enumerate(chapters_to_download):
-                            chapter_url = st.session_state.chapters[chapter_num]
-                            overall_status.text(
-                                f"Processing chapter {chapter_num} ({i+1}/{total_chapters})"
-                            )
-
-                            images_count, was_skipped = download_chapter_images(
-                                chapter_url,
-                                manga_title,
-                                chapter_num,
-                                st.session_state.container_selector,
-                                st.session_state.delay,
-                                st.session_state.skip_existing,
-                            )
-
-                            if was_skipped:
-                                skipped_chapters += 1
-
-                            total_images += images_count
-                            chapter_progress.progress((i + 1) / total_chapters)
-
-                        if skipped_chapters > 0:
-                            overall_status.text(
-                                f"Download complete! {total_images} images downloaded across {total_chapters - skipped_chapters} chapters. {skipped_chapters} chapters were skipped."
-                            )
-                        else:
-                            overall_status.text(
-                                f"Download complete! {total_images} images downloaded across {total_chapters} chapters."
-                            )
-
-                        st.success(
-                            f"Successfully downloaded {total_chapters - skipped_chapters} chapters of '{manga_title}'"
-                        )
+                        run_downloads(chapters_to_download, manga_title)
 
             with col2:
                 # Add a "Download All" button
                 if st.button("Download All Chapters"):
-                    chapter_nums = sorted(
-                        st.session_state.chapters.keys(), key=lambda x: int(x)
-                    )
-                    total_chapters = len(chapter_nums)
-                    total_images = 0
-                    skipped_chapters = 0
-
-                    chapter_progress = st.progress(0)
-                    overall_status = st.empty()
-
-                    for i, chapter_num in enumerate(chapter_nums):
-                        chapter_url = st.session_state.chapters[chapter_num]
-                        overall_status.text(
-                            f"Processing chapter {chapter_num} ({i+1}/{total_chapters})"
-                        )
-
-                        images_count, was_skipped = download_chapter_images(
-                            chapter_url,
-                            manga_title,
-                            chapter_num,
-                            st.session_state.container_selector,
-                            st.session_state.delay,
-                            st.session_state.skip_existing,
-                        )
-
-                        if was_skipped:
-                            skipped_chapters += 1
-
-                        total_images += images_count
-                        chapter_progress.progress((i + 1) / total_chapters)
-
-                    if skipped_chapters > 0:
-                        overall_status.text(
-                            f"Download complete! {total_images} images downloaded across {total_chapters - skipped_chapters} chapters. {skipped_chapters} chapters were skipped."
-                        )
-                    else:
-                        overall_status.text(
-                            f"Download complete! {total_images} images downloaded across {total_chapters} chapters."
-                        )
-
-                    st.success(
-                        f"Successfully downloaded {total_chapters - skipped_chapters} chapters of '{manga_title}'"
-                    )
+                    run_downloads(st.session_state.sorted_chapter_nums, manga_title)
 
 with tab2:
-    st.subheader("Browse Downloaded Manga")
-
-    available_manga = get_available_manga()
-
-    if not available_manga:
-        st.info("No manga downloaded yet. Use the Download tab to get started!")
-    else:
-        selected_manga = st.selectbox("Select Manga", available_manga)
-
-        if selected_manga:
-            available_chapters = get_available_chapters(selected_manga)
-
-            if not available_chapters:
-                st.info(f"No chapters found for {selected_manga}")
-            else:
-                selected_chapter = st.selectbox("Select Chapter", available_chapters)
-
-                if selected_chapter:
-                    chapter_images = get_chapter_images(
-                        selected_manga, selected_chapter
-                    )
-
-                    if not chapter_images:
-                        st.info(f"No images found in {selected_chapter}")
-                    else:
-                        # Image viewer with preloaded images
-                        total_images = len(chapter_images)
-
-                        # Initialize the session state for image index if it doesn't exist
-                        if "image_index" not in st.session_state:
-                            st.session_state.image_index = 0
-
-                        # Ensure the index is within bounds
-                        if st.session_state.image_index >= total_images:
-                            st.session_state.image_index = 0
-
-                        # Create the viewer HTML with all images preloaded
-                        viewer_html = create_image_viewer_html(
-                            chapter_images, st.session_state.image_index
-                        )
-
-                        # Display the viewer
-                        components.html(viewer_html, height=800, scrolling=True)
-
-                        # Add warning about memory usage for large chapters
-                        if total_images > 30:
-                            st.warning(
-                                f"This chapter has {total_images} images. If you experience performance issues, try reloading the page."
-                            )
-
-                        # Display info about keyboard shortcuts
-                        with st.expander("Keyboard Shortcuts"):
-                            st.write(
-                                """
-                                - **Left Arrow** or **A**: Previous image
-                                - **Right Arrow** or **D**: Next image
-                                - **Z**: Zoom out
-                                - **X**: Reset zoom
-                                - **C**: Zoom in
-                                - **Up/Down Arrows**: Scroll up/down when zoomed in
-                                - **F**: Toggle fullscreen
-                                - **Escape**: Exit fullscreen
-                                """
-                            )
-
+    browse_library()
 
 if __name__ == "__main__":
     # This ensures the app runs directly when executed
@@ -23,7 +23,9 @@ setup(
         "streamlit>=1.18.0",
         "requests>=2.28.1",
         "beautifulsoup4>=4.11.1",
+        "lxml>=4.9.1",
         "Pillow>=9.2.0",
+        "orjson>=3.6.0",
     ],
     entry_points={
         "console_scripts": [